@@ -4,22 +4,88 @@ Now includes logic to detect YouTube/streaming sites and use VideoDownloadTask (
 """
 
 import os
+import sched
 import threading
 import datetime
-
-from segment import Segment
+import time
+import urllib.parse
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from segment import Segment, CHUNK_SIZE
+from speed_limiter import TokenBucket
+from run_state import RunState
 from settings import SettingsManager
 from logger import Logger
 
-# Import your VideoDownloadTask
-# Make sure video_downloader.py is in the same folder and has the VideoDownloadTask class.
 from video_downloader import VideoDownloadTask
 
+# Domains handled by yt-dlp (VideoDownloadTask), matched against the URL's
+# hostname so e.g. "example.com/youtube-dl.zip" is not mistaken for a video.
+_VIDEO_DOMAINS = frozenset({"youtube.com", "youtu.be", "vimeo.com", "dailymotion.com"})
+
+# A task in one of these states still owns its destination file.
+_ACTIVE_STATUSES = frozenset({"Queued", "Downloading", "Paused", "Scheduled"})
+
+# Seconds a size/range probe result is reused for new tasks on the same URL.
+_PROBE_CACHE_TTL = 300
+
+# Weight of the newest one-second sample in the speed estimate.
+_SPEED_EMA_ALPHA = 0.3
+
+# Dynamic segmentation limits: minimum seconds between splits, the rough cost
+# in seconds of opening another connection, and the ETA gain a split must buy.
+_SPLIT_INTERVAL = 5
+_SPLIT_SETUP_SEC = 1.0
+_SPLIT_MIN_GAIN = 0.2
+
+# Files smaller than this are fetched over one connection: extra handshakes
+# would cost more than the parallelism gains.
+_MIN_SEGMENTED_SIZE = 2 * 1024 * 1024
+
+
+def _is_video_host(host):
+    """True for a video domain or any subdomain of one (www., m., music. ...)."""
+    # urlsplit().hostname is already lower-case; walk up one label at a time.
+    host = host.rstrip(".")
+    while host:
+        if host in _VIDEO_DOMAINS:
+            return True
+        host = host.partition(".")[2]
+    return False
+
+
+def _preallocate(fd, size):
+    """Reserve size bytes for fd up front (contiguous extents where the filesystem supports it)."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # No fallocate (Windows/macOS) or unsupported filesystem: just extend the file.
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+
+
 class DownloadTask:
     """
     Represents a single download with dynamic segmentation (for regular HTTP/FTP).
     """
-    def __init__(self, url, dest_folder, file_name, segments, schedule_time, logger, settings):
+    # No per-instance __dict__: smaller tasks and faster attribute access for
+    # the fields the UI reads every second.
+    __slots__ = ("id", "url", "dest_folder", "file_name", "segments", "schedule_time", "logger", "settings",
+                 "_executor", "_manager", "file_size", "progress", "speed", "eta", "status", "date_added",
+                 "date_added_str",
+                 "_run_state", "_monitor", "_lock", "_progress_cv", "_seg_exited", "_seg_done", "bucket", "_session",
+                 "_segments", "_segment_futures", "_max_segments", "_last_split_ts", "_split_pending",
+                 "_accepts_ranges", "_validator", "_total_downloaded", "_start_time")
+
+    def __init__(self, url, dest_folder, file_name, segments, schedule_time, logger, settings, executor,
+                 session, manager=None):
+        self.id = uuid.uuid4().hex  # stable key for UI bookkeeping
         self.url = url
         self.dest_folder = dest_folder
         self.file_name = file_name if file_name else os.path.basename(url)
@@ -27,6 +93,8 @@ class DownloadTask:
         self.schedule_time = schedule_time
         self.logger = logger
         self.settings = settings
+        self._executor = executor  # DownloadManager's shared worker pool
+        self._manager = manager    # owner; caches size probes across tasks
 
         # For UI
         self.file_size = 0
@@ -35,16 +103,38 @@ class DownloadTask:
         self.eta = "N/A"
         self.status = "Queued"
         self.date_added = datetime.datetime.now()
+        self.date_added_str = self.date_added.strftime("%b %d, %Y %H:%M:%S")  # never changes; format once
 
         # Threading events/locks
-        self._stop_event = threading.Event()
-        self._pause_event = threading.Event()
-        self._pause_event.set()  # not paused initially
+        # Running/paused/stopped state of the current run, shared with its
+        # segments; each start_download creates a new one (see there).
+        self._run_state = RunState()
+        self._monitor = None  # the current run's monitor thread
         self._lock = threading.Lock()
+        # Segment threads notify this when they exit; the monitor waits on it.
+        self._progress_cv = threading.Condition()
+        self._seg_exited = False  # a segment returned since the monitor last looked
+        self._seg_done = False    # ... and at least one of them finished its range
+
+        # Speed limit shared by all segments (bytes/s, 0 = unlimited); the
+        # details window adjusts bucket.rate while the download runs.
+        self.bucket = TokenBucket(settings.speed_limit * 1024)
+
+        # DownloadManager's pooled session, shared by every task and segment.
+        self._session = session
 
         # Segments
         self._segments = []
-        self._total_downloaded = 0
+        self._segment_futures = []  # pending/running segment jobs, cancelled on stop
+        # Cap on segments downloading at once, dynamic splits included: the
+        # requested count, but never more than this task's share of the pool
+        # (which is sized max_concurrent_downloads * segments_per_task).
+        self._max_segments = max(1, min(self.segments, settings.segments_per_task))
+        self._last_split_ts = 0
+        self._split_pending = False  # a split was deferred (interval gate, or not worth it yet)
+        self._accepts_ranges = False
+        self._validator = (None, None)  # (ETag, Last-Modified) of the remote file
+        self._total_downloaded = 0  # kept current by segments via _add_bytes
         self._start_time = None
 
     def start_download(self):
@@ -52,158 +142,383 @@ class DownloadTask:
         if self.status not in ["Queued", "Paused", "Error"]:
             return
         self.status = "Downloading"
-        self._stop_event.clear()
-        self._pause_event.set()
+        # A fresh RunState per run: threads of the previous run that are still
+        # finishing a read keep seeing theirs as stopped, instead of being
+        # switched back to running together with the new run's threads.
+        previous, run_state = self._run_state, RunState()
+        self._run_state = run_state
+        previous.stop()  # normally already stopped by pause()/stop()
+        self._changed()
+        # A quick pause/resume gets here while the previous run's segments may
+        # still be blocked in a read. They share the Segment objects (and byte
+        # counts) this run is about to reuse, so let them exit first.
+        if self._monitor is not None:
+            self._monitor.join()
+        wait_futures(self._segment_futures)
+        if run_state.is_stopped():
+            return  # stopped again while waiting; stop() has set the status
 
         self.logger.log(f"Starting download (segmented): {self.file_name}")
-        self._fetch_file_size()
+        if self._segments:
+            # Resuming: always re-probe, the remote file may have changed meanwhile.
+            previous = (self.file_size, self._validator)
+            self._fetch_file_size()
+            if self._remote_changed(previous):
+                self._discard_segments()
+        else:
+            cached = self._manager.get_cached_probe(self.url) if self._manager else None
+            if cached:
+                self.file_size, self._accepts_ranges, self._validator = cached
+            else:
+                self._fetch_file_size()
 
         self._start_time = datetime.datetime.now()
 
-        # Create initial segments
-        self._create_segments()
-
-        # Monitor thread
-        monitor_thread = threading.Thread(target=self._monitor_progress, daemon=True)
-        monitor_thread.start()
+        # Create initial segments; on resume, keep the existing ones so each
+        # continues from its own byte counter.
+        fresh = not self._segments
+        if fresh:
+            self._create_segments()
+        else:
+            for seg in self._segments:
+                if not seg.is_finished:
+                    seg.is_stopped = False
+        # Seed the running total once; from here segments report deltas.
+        self._total_downloaded = sum(s.downloaded for s in self._segments)
+        if self.file_size > 0:
+            try:
+                self._prepare_output_file(truncate=fresh)
+            except OSError as e:
+                self.logger.log(f"Error preparing output file for {self.file_name}: {e}")
+                self.status = "Error"
+                self._changed()
+                return
+
+        # Monitor thread. Kept out of the worker pool: it waits on this task's
+        # segments, and parking it on a pool worker could starve them.
+        self._monitor = threading.Thread(target=self._monitor_progress, args=(run_state,), daemon=True)
+        self._monitor.start()
 
         # Start each segment
+        self._segment_futures = []
         for seg in self._segments:
-            t = threading.Thread(target=self._download_segment, args=(seg,), daemon=True)
-            t.start()
+            if seg.is_finished:
+                continue
+            self._segment_futures.append(self._executor.submit(self._download_segment, seg, run_state))
+
+    def _prepare_output_file(self, truncate):
+        """Create the final file at its full size so segments can write straight into their ranges."""
+        final_path = os.path.join(self.dest_folder, self.file_name)
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if truncate:
+            flags |= os.O_TRUNC
+        fd = os.open(final_path, flags)
+        try:
+            _preallocate(fd, self.file_size)
+        finally:
+            os.close(fd)
 
     def _fetch_file_size(self):
-        import requests
+        """
+        Discover the file size with a one-byte ranged GET rather than a HEAD:
+        a 206 reply carries the total in Content-Range and proves the server
+        honours Range, all in the same round trip.
+        """
         try:
-            headers = {}
-            if self.settings.user_agent:
-                headers["User-Agent"] = self.settings.user_agent
-            r = requests.head(self.url, headers=headers, allow_redirects=True, timeout=10)
-            cl = r.headers.get("Content-Length")
-            if cl:
-                self.file_size = int(cl)
+            headers = {"Range": "bytes=0-0"}
+            with self._session.get(self.url, headers=headers, stream=True,
+                                   allow_redirects=True, timeout=10) as r:
+                r.raise_for_status()
+                self._validator = (r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                if r.status_code == 206:
+                    self._accepts_ranges = True
+                    total = r.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+                    if total.isdigit():
+                        self.file_size = int(total)
+                else:
+                    # Range ignored: the body is the whole file, so Content-Length is its size.
+                    self._accepts_ranges = False
+                    cl = r.headers.get("Content-Length")
+                    if cl:
+                        self.file_size = int(cl)
         except Exception as e:
             self.logger.log(f"Error fetching file size for {self.url}: {e}")
+            return
+        if self._manager and self.file_size > 0:
+            self._manager.cache_probe(self.url, (self.file_size, self._accepts_ranges, self._validator))
+
+    def _remote_changed(self, previous):
+        """On resume, tell whether the remote file differs from the one the existing bytes came from."""
+        old_size, old_validator = previous
+        if self.file_size != old_size:
+            self.logger.log(f"Remote size changed ({old_size} -> {self.file_size}); restarting {self.file_name}")
+            return True
+        (old_etag, old_modified), (etag, modified) = old_validator, self._validator
+        if old_etag and etag and old_etag != etag:
+            self.logger.log(f"Remote ETag changed; restarting {self.file_name}")
+            return True
+        if old_modified and modified and old_modified != modified:
+            self.logger.log(f"Remote Last-Modified changed; restarting {self.file_name}")
+            return True
+        return False
+
+    def _discard_segments(self):
+        """Drop all partial data so the download starts again from byte 0."""
+        for seg in self._segments:
+            if not seg.in_place and os.path.exists(seg.temp_path):
+                os.remove(seg.temp_path)
+        self._segments = []
+        self._total_downloaded = 0
 
     def _create_segments(self):
         """Create initial segments based on file_size."""
-        if self.file_size > 0:
-            part_size = self.file_size // self.segments
-            for i in range(self.segments):
+        if self.file_size > 0 and not self._accepts_ranges:
+            # The server ignores Range: every segment would receive the whole
+            # body, so fetch it once over a single connection.
+            self.logger.log(f"Server does not support ranges; using a single connection for {self.file_name}")
+            seg = Segment(self.url, self.dest_folder, self.file_name, 0, None,
+                          self.logger, self.settings, self._session, in_place=True, bucket=self.bucket)
+            self._segments.append(seg)
+        elif self.file_size > 0:
+            count = self.segments if self.file_size >= _MIN_SEGMENTED_SIZE else 1
+            part_size = self.file_size // count
+            for i in range(count):
                 start = i * part_size
                 end = ((i + 1) * part_size) - 1
-                if i == self.segments - 1:
+                if i == count - 1:
                     end = self.file_size - 1
-                seg = Segment(self.url, self.dest_folder, self.file_name, start, end, self.logger, self.settings)
+                seg = Segment(self.url, self.dest_folder, self.file_name, start, end,
+                              self.logger, self.settings, self._session, in_place=True, bucket=self.bucket)
                 self._segments.append(seg)
         else:
-            # Unknown size => single open-ended segment
-            seg = Segment(self.url, self.dest_folder, self.file_name, 0, None, self.logger, self.settings)
+            # Unknown size => single open-ended segment, written to a part file
+            # and moved into place by _merge_segments.
+            seg = Segment(self.url, self.dest_folder, self.file_name, 0, None,
+                          self.logger, self.settings, self._session, bucket=self.bucket)
             self._segments.append(seg)
 
-    def _download_segment(self, seg: Segment):
-        seg.download(self._stop_event, self._pause_event)
+    def _changed(self):
+        # Push model: tell the manager (and through it the UI) that fields shown
+        # in the table moved, instead of the UI polling every task.
+        if self._manager:
+            self._manager.task_changed(self)
 
-    def _monitor_progress(self):
-        import time
-        self._speed_samples = []
+    def _add_bytes(self, seg, n):
+        # Called from segment threads; += on an attribute is not atomic.
+        with self._lock:
+            # A segment dropped by the single-stream fallback may still report
+            # one in-flight chunk; the total was re-seeded without it.
+            if seg in self._segments:
+                self._total_downloaded += n
+
+    def _download_segment(self, seg: Segment, run_state):
+        seg.download(run_state, lambda n: self._add_bytes(seg, n))
+        if seg.range_ignored:
+            self._fall_back_to_single_stream(run_state)
+        with self._progress_cv:
+            self._seg_exited = True
+            if seg.is_finished:
+                self._seg_done = True  # lets the monitor hand the free connection new work
+            self._progress_cv.notify()
+
+    def _monitor_progress(self, run_state):
+        self.speed = 0
         last_total = self._total_downloaded
-        while not self._stop_event.is_set():
-            with self._lock:
-                current_total = self._total_downloaded
-            delta = current_total - last_total
-            speed_sample = delta / 1024.0  # KB/s for the last second
-            self._speed_samples.append(speed_sample)
-            if len(self._speed_samples) > 5:
-                self._speed_samples.pop(0)
-            avg_speed = sum(self._speed_samples) / len(self._speed_samples)
-            self.speed = avg_speed
+        last_time = time.monotonic()
+        # Segments are only walked after one exits: finishing or failing is the
+        # only thing that changes the outcome of those scans. The first tick
+        # walks them too (a resume may find every segment already finished).
+        exited = True
+        while True:
+            with self._progress_cv:
+                # Tick once a second, but wake at once when a segment ends
+                # (completion, failure or a free connection to re-split for).
+                if not self._seg_exited and not run_state.is_stopped():
+                    self._progress_cv.wait(1.0)
+                exited = exited or self._seg_exited
+                self._seg_exited = False
+                split = self._seg_done
+                self._seg_done = False
+            if run_state.is_stopped():
+                break
+
+            # Segments push their progress into _total_downloaded, so a tick reads
+            # one int instead of walking every segment (reading needs no lock).
+            current_total = self._total_downloaded
+            now = time.monotonic()
+            delta = max(0, current_total - last_total)
+            speed_sample = delta / 1024.0 / max(now - last_time, 0.001)  # KB/s since the last tick
+            # Exponential moving average: O(1) and weighted towards recent samples.
+            if self.speed:
+                self.speed = _SPEED_EMA_ALPHA * speed_sample + (1 - _SPEED_EMA_ALPHA) * self.speed
+            else:
+                self.speed = speed_sample
             last_total = current_total
+            last_time = now
 
-            elapsed = (datetime.datetime.now() - self._start_time).total_seconds()
             if self.file_size > 0:
-                self.progress = int((self._total_downloaded / self.file_size) * 100)
-                remaining = self.file_size - self._total_downloaded
+                # Clamped: a brief overcount must not show as >100% or a negative ETA.
+                self.progress = min(100, int((current_total / self.file_size) * 100))
+                remaining = max(0, self.file_size - current_total)
                 if self.speed > 0:
-                    eta_sec = remaining / (self.speed * 1024)
-                    self.eta = time.strftime("%H:%M:%S", time.gmtime(eta_sec))
+                    # divmod instead of gmtime+strftime: cheaper, and hours
+                    # keep counting past a day instead of wrapping to 00.
+                    minutes, secs = divmod(int(remaining / (self.speed * 1024)), 60)
+                    hours, minutes = divmod(minutes, 60)
+                    self.eta = f"{hours:02d}:{minutes:02d}:{secs:02d}"
                 else:
                     self.eta = "N/A"
             else:
                 self.progress = 0
                 self.eta = "N/A"
+            self._changed()
 
-            if all(s.is_finished for s in self._segments):
-                self._merge_segments()
-                if not self._stop_event.is_set():
+            if exited and all(s.is_finished for s in self._segments):
+                if self.file_size > 0:
+                    # Segments wrote straight into the final file; nothing to merge.
+                    self.logger.log(f"Download completed: {self.file_name}")
+                else:
+                    self._merge_segments()
+                if not run_state.is_stopped() and self.status != "Error":
                     self.status = "Completed"
                 break
 
-            self._attempt_dynamic_segmentation()
-            time.sleep(1)
+            if run_state.is_stopped():
+                break  # paused/stopped mid-tick; segments exiting is expected
 
+            if exited and not any(not s.is_finished and not s.is_stopped for s in self._segments):
+                # Every unfinished segment gave up (network error, ignored Range, ...).
+                self.status = "Error"
+                self.logger.log(f"Download failed: {self.file_name}")
+                break
 
-    def _attempt_dynamic_segmentation(self):
-        """If a segment finished, find the largest active segment and split it."""
-        if self.file_size == 0:
-            return  # can't re-split effectively if unknown
+            exited = False
 
-        finished_segments = [s for s in self._segments if s.is_finished]
-        if not finished_segments:
-            return
+            # Only re-split when a segment has actually finished since the last
+            # tick (or an earlier finish was deferred by the split interval).
+            if split or self._split_pending:
+                self._attempt_dynamic_segmentation(run_state)
+        self._changed()  # final status (Completed/Error) or the stop that ended the loop
+
+
+    def _fall_back_to_single_stream(self, run_state):
+        """
+        A segment got 200 instead of 206 although the probe saw range support
+        (e.g. a CDN node that ignores Range): abort the other segments and
+        fetch the whole file once over a single connection.
+        """
+        with self._lock:
+            if not self._accepts_ranges:
+                return  # another segment already triggered the fallback
+            self._accepts_ranges = False
+            self.logger.log(f"Server ignored Range; downloading {self.file_name} over a single connection")
+            seg = Segment(self.url, self.dest_folder, self.file_name, 0, None,
+                          self.logger, self.settings, self._session, in_place=True, bucket=self.bucket)
+            # Swap the list first so the monitor never sees a task with no live segment.
+            old_segments, self._segments = self._segments, [seg]
+            for s in old_segments:
+                s.is_stopped = True
+            self._total_downloaded = 0
+        if self._manager:
+            self._manager.cache_probe(self.url, (self.file_size, False, self._validator))
+        self._segment_futures.append(self._executor.submit(self._download_segment, seg, run_state))
+
+    def _attempt_dynamic_segmentation(self, run_state):
+        """A segment finished: split the active segment with most bytes left, if worth it."""
+        self._split_pending = False
+        if self.file_size == 0 or not self._accepts_ranges:
+            return  # can't re-split if the size is unknown or ranges are unsupported
         active_segments = [s for s in self._segments if not s.is_finished and not s.is_stopped]
-        if not active_segments:
+        if not active_segments or len(active_segments) >= self._max_segments:
+            return
+        if time.monotonic() - self._last_split_ts < _SPLIT_INTERVAL:
+            self._split_pending = True  # retry on a later tick
             return
 
         largest_seg = max(active_segments, key=lambda x: x.remaining)
-        if largest_seg.remaining > 1024 * 1024:  # at least 1 MB
-            midpoint = largest_seg.start + (largest_seg.remaining // 2)
-            new_seg_start = midpoint + 1
-            new_seg_end = largest_seg.end
-
-            largest_seg.end = midpoint
-
-            new_seg = Segment(self.url, self.dest_folder, self.file_name,
-                              new_seg_start, new_seg_end, self.logger, self.settings)
-            self._segments.append(new_seg)
-            t = threading.Thread(target=self._download_segment, args=(new_seg,), daemon=True)
-            t.start()
+        # One snapshot of the write position: the segment keeps advancing.
+        done = largest_seg.downloaded
+        remaining = (largest_seg.end - largest_seg.start) + 1 - done
+        # The segment may hold up to one read (CHUNK_SIZE) beyond `done` that it
+        # is about to write; the split point must lie past it, and each half
+        # should still be worth a connection.
+        if remaining <= 2 * CHUNK_SIZE:
+            return
+        # The candidate's own rate: the task's speed also counts segments that
+        # just finished, which made a slow straggler look almost done.
+        seg_speed = largest_seg.rate()  # bytes/s
+        if seg_speed > 0:
+            # Halving the range halves its ETA, minus the cost of a new connection;
+            # near the end of a segment that no longer pays off.
+            old_eta = remaining / seg_speed
+            new_eta = remaining / 2 / seg_speed + _SPLIT_SETUP_SEC
+            if new_eta > old_eta * (1 - _SPLIT_MIN_GAIN):
+                self._split_pending = True  # rates change; look again next tick
+                return
+
+        midpoint = largest_seg.start + done + max(remaining // 2, CHUNK_SIZE)
+        new_seg_start = midpoint + 1
+        new_seg_end = largest_seg.end
+
+        largest_seg.end = midpoint
+
+        new_seg = Segment(self.url, self.dest_folder, self.file_name,
+                          new_seg_start, new_seg_end, self.logger, self.settings, self._session,
+                          in_place=True, bucket=self.bucket)
+        self._segments.append(new_seg)
+        self._last_split_ts = time.monotonic()
+        self._segment_futures.append(self._executor.submit(self._download_segment, new_seg, run_state))
 
     def _merge_segments(self):
+        # Only reached for an unknown size, which always downloads as one
+        # open-ended segment (no splits without a size): its part file already
+        # is the whole file, so move it into place.
         final_path = os.path.join(self.dest_folder, self.file_name)
         try:
-            with open(final_path, "wb") as out:
-                for seg in sorted(self._segments, key=lambda x: x.start if x.start else 0):
-                    seg_path = seg.temp_path
-                    if os.path.exists(seg_path):
-                        with open(seg_path, "rb") as f:
-                            out.write(f.read())
-                        os.remove(seg_path)
-            self.logger.log(f"Download completed and merged: {self.file_name}")
+            try:
+                os.replace(self._segments[0].temp_path, final_path)
+            except FileNotFoundError:
+                open(final_path, "wb").close()  # empty body, no part written
+            self.logger.log(f"Download completed: {self.file_name}")
         except Exception as e:
-            self.logger.log(f"Error merging segments for {self.file_name}: {e}")
+            self.logger.log(f"Error moving {self.file_name} into place: {e}")
             self.status = "Error"
 
     def pause(self):
+        # Pausing ends the run rather than parking its segment threads: a
+        # parked segment would hold a worker of the shared pool, and a few
+        # paused tasks could leave none for new downloads. Each segment keeps
+        # its byte count, so resume() continues where it left off.
         if self.status == "Downloading":
-            self._pause_event.clear()
-            self.status = "Paused"
+            self.stop(pause_only=True)
             self.logger.log(f"Paused: {self.file_name}")
 
     def resume(self):
         if self.status == "Paused":
-            self._pause_event.set()
-            self.status = "Downloading"
             self.logger.log(f"Resumed: {self.file_name}")
+            self._executor.submit(self.start_download)
 
     def stop(self, pause_only=False):
-        self._stop_event.set()
+        self._run_state.stop()  # also cuts short a speed-limit wait
+        # Segments still queued in the pool never start; running ones see the
+        # stop at their next chunk. The futures are kept: start_download
+        # waits for them before a resume reuses the segments.
+        for future in self._segment_futures:
+            future.cancel()
+        with self._progress_cv:
+            self._progress_cv.notify()  # let the monitor exit now, not at its next tick
         if pause_only:
-            self._pause_event.clear()
             self.status = "Paused"
         else:
             self.status = "Cancelled"
             self.logger.log(f"Stopped: {self.file_name}")
+        self._changed()
+
+
+# What an Add URL dialog hands to DownloadManager.add_download.
+DownloadRequest = namedtuple("DownloadRequest",
+                             "url dest_folder file_name segments schedule_time resolution",
+                             defaults=("Best",))
 
 
 class DownloadManager:
@@ -215,8 +530,115 @@ class DownloadManager:
     def __init__(self, logger: Logger, settings: SettingsManager):
         self.logger = logger
         self.settings = settings
-        self.tasks = []
-        self._lock = threading.Lock()
+        # Immutable snapshot, replaced wholesale under _lock by add/remove, so
+        # readers (the UI polls every second) never need the lock.
+        self.tasks = ()
+        self._lock = threading.Lock()  # serializes writers of the task list and lookup dicts
+
+        # One bounded pool runs task starts and segment downloads, instead of a
+        # fresh thread for each; excess work queues until a worker frees up.
+        workers = self.settings.max_concurrent_downloads * self.settings.segments_per_task
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="idm-worker")
+        # A video task's start() blocks inside yt-dlp for the whole download, so
+        # video tasks get their own pool, bounded by the concurrent-download
+        # limit, rather than holding workers the segments need.
+        self._video_executor = ThreadPoolExecutor(max_workers=max(1, self.settings.max_concurrent_downloads),
+                                                  thread_name_prefix="idm-video")
+
+        # One pooled session for every request of every task: segments, splits
+        # and repeat downloads from a host reuse TCP connections and TLS
+        # sessions instead of handshaking each time.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=256,
+                              max_retries=Retry(total=3, backoff_factor=0.3))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Ask for the bytes as stored: Range offsets then map straight onto the
+        # file, and the read loop hands chunks to write() without running them
+        # through a decompressor first.
+        self.session.headers["Accept-Encoding"] = "identity"
+        self._apply_session_settings()
+
+        # Scheduled downloads: a heap-backed scheduler run by one daemon thread
+        # that sleeps until the next due time (or until a new entry arrives).
+        self._sched_wakeup = threading.Event()
+        self._sched = sched.scheduler(time.time, self._sched_wait)
+        self._sched_events = {}  # task -> sched event, so removal can cancel it
+        threading.Thread(target=self._run_scheduler, daemon=True).start()
+
+        # url -> ((file_size, accepts_ranges, validator), time cached); saves
+        # the size probe round trip when the same URL is added again.
+        self._probe_cache = {}
+
+        # (url, destination path) -> task, to catch the same download being added twice.
+        self._by_key = {}
+
+        # Callables invoked as fn(task) from any thread when a task's visible
+        # state changes or a task is added/removed (see add_listener).
+        self._listeners = ()
+
+    def _apply_session_settings(self):
+        # Defaults sent with every request; re-applied when downloads are added
+        # so edits made in the settings dialog take effect.
+        if self.settings.user_agent:
+            self.session.headers["User-Agent"] = self.settings.user_agent
+        else:
+            self.session.headers["User-Agent"] = requests.utils.default_user_agent()
+        if self.session.proxies != self.settings.proxies:
+            self.session.proxies = dict(self.settings.proxies)
+
+    def add_listener(self, fn):
+        """
+        Register fn(task), called whenever a task's status/progress/speed/ETA
+        changes (about once a second while downloading) or it is added/removed.
+        It runs on the worker thread that made the change; GUI listeners must
+        hand it over to their own thread.
+        """
+        with self._lock:
+            self._listeners = self._listeners + (fn,)
+
+    def task_changed(self, task):
+        for fn in self._listeners:
+            fn(task)
+
+    def get_cached_probe(self, url):
+        with self._lock:
+            entry = self._probe_cache.get(url)
+        if entry and time.monotonic() - entry[1] < _PROBE_CACHE_TTL:
+            return entry[0]
+        return None
+
+    def cache_probe(self, url, probe):
+        with self._lock:
+            self._probe_cache[url] = (probe, time.monotonic())
+
+    def _sched_wait(self, delay):
+        # Like time.sleep, but cut short by _sched_wakeup so that a newly added
+        # earlier entry is not stuck behind a long sleep.
+        self._sched_wakeup.wait(delay)
+        self._sched_wakeup.clear()
+
+    def _run_scheduler(self):
+        while True:
+            self._sched.run()
+            self._sched_wakeup.wait()
+            self._sched_wakeup.clear()
+
+    def _start_scheduled(self, task):
+        with self._lock:
+            self._sched_events.pop(task, None)
+        if task.status != "Scheduled":
+            return  # stopped or removed meanwhile
+        self.logger.log(f"Scheduled download starting: {task.file_name}")
+        task.status = "Queued"
+        self.task_changed(task)
+        self._submit_start(task)
+
+    def _submit_start(self, task):
+        if isinstance(task, VideoDownloadTask):
+            task._future = self._video_executor.submit(task.start_download)  # stop() cancels it while queued
+            return task._future
+        return self.executor.submit(task.start_download)
 
     def add_download(self, url, dest_folder, file_name, segments, schedule_time, resolution="Best"):
         if not dest_folder:
@@ -225,8 +647,21 @@ class DownloadManager:
             os.makedirs(dest_folder, exist_ok=True)
 
         # Check if it's a known video/streaming site.
-        if any(domain in url.lower() for domain in ["youtube", "youtu.be", "vimeo", "dailymotion"]):
-            from video_downloader import VideoDownloadTask
+        host = urllib.parse.urlsplit(url).hostname or ""
+        is_video = _is_video_host(host)
+
+        # Adding a URL that is already being fetched to the same file (clipboard
+        # prompt plus a manual add, say) would download it twice and have both
+        # tasks write the same file; hand back the existing task instead.
+        name = file_name or ("" if is_video else os.path.basename(url))
+        key = (url, os.path.abspath(os.path.join(dest_folder, name)))
+        with self._lock:
+            existing = self._by_key.get(key)
+        if existing is not None and existing.status in _ACTIVE_STATUSES:
+            self.logger.log(f"Already downloading {url} to {key[1]}; deduplicated")
+            return existing
+
+        if is_video:
             task = VideoDownloadTask(
                 url=url,
                 dest_folder=dest_folder,
@@ -234,39 +669,55 @@ class DownloadManager:
                 schedule_time=schedule_time,
                 settings=self.settings,
                 logger=self.logger,
-                resolution=resolution
+                resolution=resolution,
+                on_change=self.task_changed
             )
             self.logger.log(f"Detected streaming/video site. Using VideoDownloadTask for {file_name or url}")
         else:
-            task = DownloadTask(url, dest_folder, file_name, segments, schedule_time, self.logger, self.settings)
+            self._apply_session_settings()
+            task = DownloadTask(url, dest_folder, file_name, segments, schedule_time, self.logger, self.settings,
+                                self.executor, self.session, manager=self)
 
         with self._lock:
-            self.tasks.append(task)
+            self.tasks = self.tasks + (task,)
+            self._by_key[key] = task
 
         now = datetime.datetime.now()
         if schedule_time and schedule_time > now:
             task.status = "Scheduled"
+            with self._lock:
+                self._sched_events[task] = self._sched.enterabs(
+                    schedule_time.timestamp(), 1, self._start_scheduled, (task,))
+            self._sched_wakeup.set()
             self.logger.log(f"Download scheduled for {task.file_name} at {schedule_time}")
         else:
-            import threading
-            threading.Thread(target=task.start_download, daemon=True).start()
+            self._submit_start(task)
 
+        self.task_changed(task)
         return task
 
 
     def last_task(self):
-        with self._lock:
-            return self.tasks[-1] if self.tasks else None
+        tasks = self.tasks
+        return tasks[-1] if tasks else None
 
     def get_all_tasks(self):
-        with self._lock:
-            return list(self.tasks)
+        return self.tasks  # a tuple; safe to hold while other threads add or remove
 
     def remove_task(self, task):
         task.stop()
         with self._lock:
             if task in self.tasks:
-                self.tasks.remove(task)
+                self.tasks = tuple(t for t in self.tasks if t is not task)
+            for key in [k for k, t in self._by_key.items() if t is task]:
+                del self._by_key[key]
+            event = self._sched_events.pop(task, None)
+        if event is not None:
+            try:
+                self._sched.cancel(event)
+            except ValueError:
+                pass  # already fired
+        self.task_changed(task)
 
     def resume_task(self, task):
         """
@@ -274,13 +725,9 @@ class DownloadManager:
         For a video task, we typically rely on yt-dlp's logic, which doesn't do partial segment resume the same way.
         """
         if task.status == "Paused":
-            # If it's a segmented DownloadTask
-            if isinstance(task, DownloadTask):
-                # We can re-start the same task logic
-                threading.Thread(target=task.start_download, daemon=True).start()
-            else:
-                # If it's a VideoDownloadTask, there's limited 'resume' support
-                task.resume()
+            # Segmented tasks continue from their segments' byte counters;
+            # video tasks restart yt-dlp, which continues its .part file.
+            self._submit_start(task)
         elif task.status in ["Cancelled", "Completed", "Error"]:
             # Possibly re-download from scratch or ignore
             pass
@@ -297,9 +744,9 @@ class DownloadManager:
             if task.status in ["Downloading", "Paused", "Queued", "Scheduled"]:
                 task.stop()
 
-    def check_scheduled_downloads(self):
-        now = datetime.datetime.now()
-        for task in self.get_all_tasks():
-            if task.status == "Scheduled" and task.schedule_time and task.schedule_time <= now:
-                self.logger.log(f"Scheduled download starting: {task.file_name}")
-                threading.Thread(target=task.start_download, daemon=True).start()
+    def shutdown(self):
+        """Stop every download and release the worker pool (call when the app closes)."""
+        self.stop_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._video_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -11,10 +11,23 @@ from PyQt5.QtWidgets import (QMainWindow, QTableWidget, QTableWidgetItem, QProgr
                              QLineEdit, QPushButton, QFileDialog, QSpinBox, QDateTimeEdit,
                              QHBoxLayout, QMessageBox)
 from PyQt5.QtCore import Qt, QTimer, QDateTime
-from download_manager import DownloadManager
+from download_manager import DownloadManager, DownloadRequest
 from settings import SettingsManager
 from logger import Logger
 
+# A basic check for a download URL (HTTP, HTTPS, or FTP), compiled once.
+_URL_RE = re.compile(r'^(?:https?|ftp)://\S+$', re.ASCII)
+
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+def human_readable_size(size):
+    # Convert bytes to a human-readable format.
+    if size < 1024:
+        return f"{size:.2f} B"
+    # (bit_length() - 1) // 10 == floor(log1024(size)): picks the unit without a divide loop.
+    unit = min((int(size).bit_length() - 1) // 10, 5)
+    return f"{size / (1 << (unit * 10)):.2f} {_UNITS[unit]}"
+
 class IDMMainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -45,6 +58,10 @@ class IDMMainWindow(QMainWindow):
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
         self.layout.addWidget(self.table)
+        # Row bookkeeping for refresh_table: tasks in row order, and each
+        # task's cells plus the values last shown in them.
+        self._row_tasks = []
+        self._row_widgets = {}
         
     def create_menu_bar(self):
         menubar = self.menuBar()
@@ -79,50 +96,93 @@ class IDMMainWindow(QMainWindow):
         toolbar.addAction(resume_action)
         
     def setup_timers(self):
-        # Timer to update download table every second.
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.refresh_table)
-        self.update_timer.start(1000)
-        
-        # Timer for clipboard monitoring (every 2 seconds)
-        self.clipboard_timer = QTimer(self)
-        self.clipboard_timer.timeout.connect(self.check_clipboard)
-        self.clipboard_timer.start(2000)
-        
-        # Timer to check for scheduled downloads
-        self.schedule_timer = QTimer(self)
-        self.schedule_timer.timeout.connect(self.download_manager.check_scheduled_downloads)
-        self.schedule_timer.start(1000)
-        
+        # One coarse 1 s timer drives everything, instead of a timer per job:
+        # fewer event-loop wakeups, and the OS may batch them with others.
+        # (Scheduled downloads need no polling; DownloadManager's scheduler
+        # thread starts them.)
+        self._tick_count = 0
+        self._last_clipboard_text = ""
+        self.main_timer = QTimer(self)
+        self.main_timer.setTimerType(Qt.CoarseTimer)
+        self.main_timer.timeout.connect(self._tick)
+        self.main_timer.start(1000)
+
+    def _tick(self):
+        self._tick_count += 1
+        self.refresh_table()                # every second
+        if self._tick_count % 2 == 0:
+            self.check_clipboard()          # every 2 seconds
+
     def refresh_table(self):
-        tasks = self.download_manager.get_tasks()
-        self.table.setRowCount(len(tasks))
-        for row, task in enumerate(tasks):
-            self.table.setItem(row, 0, QTableWidgetItem(task.file_name))
+        tasks = self.download_manager.get_all_tasks()
+        # Rows are created once per task and then only patched: rebuilding six
+        # items and a progress bar per row every tick kept Qt busy for nothing.
+        # The patches are applied as one batch: no repaint per cell, no
+        # itemChanged per setText, and no re-sort moving rows under our indices.
+        self.table.setUpdatesEnabled(False)
+        self.table.blockSignals(True)
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)
+        try:
+            # Drop rows whose task was removed (backwards, so row numbers stay valid).
+            live = set(tasks)
+            for row in range(len(self._row_tasks) - 1, -1, -1):
+                task = self._row_tasks[row]
+                if task not in live:
+                    self.table.removeRow(row)
+                    del self._row_tasks[row]
+                    del self._row_widgets[task]
+            # New tasks are always appended by the download manager.
+            for task in tasks[len(self._row_tasks):]:
+                self._add_row(task)
+            for task in self._row_tasks:
+                self._update_row(task)
+        finally:
+            self.table.setSortingEnabled(sorting)
+            self.table.blockSignals(False)
+            self.table.setUpdatesEnabled(True)
+
+    def _add_row(self, task):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        widgets = {"state": None}
+        for col, key in ((0, "name"), (1, "size"), (3, "speed"), (4, "eta"), (5, "status")):
+            widgets[key] = QTableWidgetItem()
+            self.table.setItem(row, col, widgets[key])
+        widgets["name"].setText(task.file_name)
+        widgets["progress"] = QProgressBar()
+        self.table.setCellWidget(row, 2, widgets["progress"])
+        self._row_tasks.append(task)
+        self._row_widgets[task] = widgets
+
+    def _update_row(self, task):
+        widgets = self._row_widgets[task]
+        # Speed is compared as displayed (0.1 KB/s), so jitter below that
+        # does not rewrite the cell every tick.
+        state = (task.file_size, task.progress, round(task.speed, 1), task.eta, task.status)
+        old = widgets["state"] or (None,) * len(state)
+        if state == old:
+            return
+        widgets["state"] = state
+        file_size, progress, speed, eta, status = state
+        if file_size != old[0]:
             # For video downloads file_size may not be set; show "N/A" if 0.
-            size_str = self.human_readable_size(task.file_size) if task.file_size else "N/A"
-            self.table.setItem(row, 1, QTableWidgetItem(size_str))
-            # Add a progress bar widget to display progress.
-            progress_bar = QProgressBar()
-            progress_bar.setValue(task.progress)
-            self.table.setCellWidget(row, 2, progress_bar)
-            self.table.setItem(row, 3, QTableWidgetItem(f"{task.speed} KB/s" if task.speed else "N/A"))
-            self.table.setItem(row, 4, QTableWidgetItem(task.eta))
-            self.table.setItem(row, 5, QTableWidgetItem(task.status))
-            
-    def human_readable_size(self, size):
-        # Convert bytes to a human-readable format.
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024:
-                return f"{size:.2f} {unit}"
-            size /= 1024
-        return f"{size:.2f} PB"
-        
+            widgets["size"].setText(human_readable_size(file_size) if file_size else "N/A")
+        if progress != old[1]:
+            widgets["progress"].setValue(progress)
+        if speed != old[2]:
+            widgets["speed"].setText(f"{speed:.1f} KB/s" if speed else "N/A")
+        if eta != old[3]:
+            widgets["eta"].setText(eta)
+        if status != old[4]:
+            widgets["status"].setText(status)
+
     def show_context_menu(self, pos):
         index = self.table.indexAt(pos)
         if index.isValid():
-            row = index.row()
-            task = self.download_manager.get_tasks()[row]
+            # Rows mirror _row_tasks, so this is the task the user actually clicked
+            # even if the manager's list changed since the last refresh.
+            task = self._row_tasks[index.row()]
             menu = QMenu(self)
             # Only allow pause/resume for direct HTTP downloads (Video tasks handled by yt-dlp are not pausable)
             if hasattr(task, "pause") and task.status == "Downloading":
@@ -147,24 +207,24 @@ class IDMMainWindow(QMainWindow):
             task.resume()
         
     def cancel_download(self, task):
-        if hasattr(task, "cancel"):
-            task.cancel()
+        self.download_manager.stop_task(task)
         
     def pause_all_downloads(self):
-        for task in self.download_manager.get_tasks():
+        for task in self.download_manager.get_all_tasks():
             if hasattr(task, "pause") and task.status == "Downloading":
                 task.pause()
                 
     def resume_all_downloads(self):
-        for task in self.download_manager.get_tasks():
+        for task in self.download_manager.get_all_tasks():
             if hasattr(task, "resume") and task.status == "Paused":
                 task.resume()
                 
     def open_add_dialog(self):
         dialog = AddDownloadDialog(self)
         if dialog.exec_() == QDialog.Accepted:
-            download_info = dialog.get_info()
-            self.download_manager.add_download(**download_info)
+            req = dialog.get_info()
+            self.download_manager.add_download(req.url, req.dest_folder, req.file_name, req.segments,
+                                               req.schedule_time)
         
     def open_settings_dialog(self):
         dialog = SettingsDialog(self, self.settings)
@@ -174,6 +234,11 @@ class IDMMainWindow(QMainWindow):
         from PyQt5.QtWidgets import QApplication
         clipboard = QApplication.clipboard()
         text = clipboard.text()
+        # Each clipboard value is considered once, so declining a URL does not
+        # re-prompt every poll.
+        if text == self._last_clipboard_text:
+            return
+        self._last_clipboard_text = text
         if self.is_valid_url(text):
             # Prompt the user if a download URL is detected in the clipboard.
             reply = QMessageBox.question(self, "Download URL Detected",
@@ -182,14 +247,18 @@ class IDMMainWindow(QMainWindow):
             if reply == QMessageBox.Yes:
                 dialog = AddDownloadDialog(self, prefill_url=text)
                 if dialog.exec_() == QDialog.Accepted:
-                    download_info = dialog.get_info()
-                    self.download_manager.add_download(**download_info)
+                    req = dialog.get_info()
+                    self.download_manager.add_download(req.url, req.dest_folder, req.file_name, req.segments,
+                                                       req.schedule_time)
                 clipboard.clear()  # Clear the clipboard to avoid repeated prompts.
                 
+    def closeEvent(self, event):
+        # Stop downloads so the worker pool can wind down before the process exits.
+        self.download_manager.shutdown()
+        event.accept()
+
     def is_valid_url(self, text):
-        # A basic check for a valid URL (HTTP, HTTPS, or FTP).
-        pattern = re.compile(r'^(https?|ftp)://')
-        return bool(pattern.match(text))
+        return bool(_URL_RE.match(text))
 
 class AddDownloadDialog(QDialog):
     def __init__(self, parent=None, prefill_url=""):
@@ -258,13 +327,13 @@ class AddDownloadDialog(QDialog):
             self.dest_input.setText(folder)
             
     def get_info(self):
-        return {
-            "url": self.url_input.text(),
-            "dest_folder": self.dest_input.text() if self.dest_input.text() else self.parent().settings.default_download_dir,
-            "file_name": self.name_input.text(),
-            "segments": self.segments_input.value(),
-            "schedule_time": self.schedule_input.dateTime().toPyDateTime() if self.schedule_input.dateTime() > QDateTime.currentDateTime() else None
-        }
+        return DownloadRequest(
+            url=self.url_input.text(),
+            dest_folder=self.dest_input.text() if self.dest_input.text() else self.parent().settings.default_download_dir,
+            file_name=self.name_input.text(),
+            segments=self.segments_input.value(),
+            schedule_time=self.schedule_input.dateTime().toPyDateTime() if self.schedule_input.dateTime() > QDateTime.currentDateTime() else None
+        )
 
 class SettingsDialog(QDialog):
     def __init__(self, parent, settings):
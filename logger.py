@@ -1,19 +1,45 @@
 """
 logger.py – Logs messages to a file and prints to console.
+Callers only enqueue the record; one background listener thread does the
+formatting and the file/console writes, so download threads never block on I/O.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
 class Logger:
     def __init__(self, log_file="idm_log.txt"):
-        logging.basicConfig(
-            filename=log_file,
-            level=logging.INFO,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-        )
         self.log_file = log_file
 
+        # Line-buffered file stream: every record reaches the file as soon as the
+        # listener writes it, so the last errors before a crash are not lost.
+        file_handler = logging.StreamHandler(open(log_file, "a", buffering=1, encoding="utf-8"))
+        file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        self._queue = queue.Queue(-1)
+        self._logger = logging.getLogger(f"idm_clone.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+        self._listener = logging.handlers.QueueListener(self._queue, file_handler, console_handler,
+                                                        respect_handler_level=True)
+        self._file_handler = file_handler
+        self._listener.start()
+        atexit.register(self.close)
+
     def log(self, message):
-        logging.info(message)
-        print(message, file=sys.stdout)
+        self._logger.info(message)
+
+    def close(self):
+        """Drain queued messages and close the log file (safe to call twice)."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        self._file_handler.stream.close()
+        self._file_handler.close()
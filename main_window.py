@@ -10,19 +10,24 @@ Features:
   • Integration with DownloadManager, SettingsManager, and Logger (make sure these modules are updated accordingly).
 """
 
+import re
 import sys
-import datetime
+import threading
+from functools import lru_cache
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QProgressBar,
+    QApplication, QMainWindow, QTableView, QAbstractItemView, QProgressBar,
     QVBoxLayout, QWidget, QAction, QToolBar, QMenu, QDialog, QLabel, QLineEdit,
     QPushButton, QFileDialog, QSpinBox, QDateTimeEdit, QHBoxLayout, QMessageBox,
-    QComboBox, QTabWidget
+    QComboBox, QTabWidget, QStyledItemDelegate, QStyleOptionProgressBar, QStyle, QHeaderView
 )
-from PyQt5.QtCore import Qt, QTimer, QDateTime
-from download_manager import DownloadManager   # Ensure this module is updated with video support.
+from PyQt5.QtCore import Qt, QTimer, QDateTime, QAbstractTableModel, QModelIndex, QObject, pyqtSignal
+from download_manager import DownloadManager, DownloadRequest   # Ensure this module is updated with video support.
 from settings import SettingsManager            # Your settings module.
 from logger import Logger                         # Your logger module.
 
+# Compiled once at import; checked when the Add URL dialog is accepted.
+_URL_RE = re.compile(r'^(?:https?|ftp)://\S+$', re.IGNORECASE)
+
 
 class AddUrlDialog(QDialog):
     def __init__(self, default_folder):
@@ -83,18 +88,179 @@ class AddUrlDialog(QDialog):
         if folder:
             self.folder_edit.setText(folder)
 
+    def accept(self):
+        # Reject a malformed URL here so the dialog stays open for a fix.
+        if not _URL_RE.match(self.url_edit.text().strip()):
+            QMessageBox.warning(self, "Invalid URL", "Please enter an http, https or ftp URL.")
+            return
+        super().accept()
+
     def get_info(self):
-        schedule_dt = self.schedule_edit.dateTime().toPyDateTime()
-        if schedule_dt <= datetime.datetime.now():
-            schedule_dt = None
-        return {
-            "url": self.url_edit.text().strip(),
-            "dest_folder": self.folder_edit.text().strip(),
-            "file_name": self.file_edit.text().strip(),
-            "segments": self.segments_spin.value(),
-            "schedule_time": schedule_dt,
-            "resolution": self.resolution_combo.currentText()
-        }
+        # Compare in Qt; convert to a Python datetime only for a real schedule.
+        qdt = self.schedule_edit.dateTime()
+        schedule_dt = qdt.toPyDateTime() if qdt > QDateTime.currentDateTime() else None
+        return DownloadRequest(
+            url=self.url_edit.text().strip(),
+            dest_folder=self.folder_edit.text().strip(),
+            file_name=self.file_edit.text().strip(),
+            segments=self.segments_spin.value(),
+            schedule_time=schedule_dt,
+            resolution=self.resolution_combo.currentText()
+        )
+
+# Cell text for values that repeat across ticks and rows (steady speeds, the
+# same percentage): cached so an unchanged value reuses one string object.
+@lru_cache(maxsize=1024)
+def fmt_speed(kbps_tenths):
+    return f"{kbps_tenths / 10:.1f} KB/s" if kbps_tenths > 0 else "0 KB/s"
+
+
+@lru_cache(maxsize=128)
+def fmt_pct(percent):
+    return f"{percent}%"
+
+
+class DownloadTableModel(QAbstractTableModel):
+    """
+    Downloads table backed by the DownloadManager's task list. Each row's cells
+    are formatted once per change and cached, so the many data() calls Qt makes
+    while painting are plain lookups, and a task update costs one dataChanged
+    signal for its row instead of new items and widgets for every row.
+    """
+    COLUMNS = ["File Name", "Size", "Status", "Progress", "Speed", "Time Left", "Date Added"]
+    _PROGRESS = len(COLUMNS)  # index of the raw percent in a cached row
+
+    def __init__(self, download_manager, parent=None):
+        super().__init__(parent)
+        self.download_manager = download_manager
+        self._source = download_manager.get_all_tasks()  # manager's tuple we last synced with
+        self._tasks = list(self._source)
+        self._cells = {}  # task -> (state, formatted cells + raw percent) as last painted
+        self._row_of = {task: row for row, task in enumerate(self._tasks)}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Qt asks for a dozen roles per cell on every paint; only two carry data,
+        # and both are served from the row's cached cells.
+        if role == Qt.DisplayRole:
+            return self._row_cells(index.row())[index.column()]
+        if role == Qt.UserRole and index.column() == 3:
+            return self._row_cells(index.row())[self._PROGRESS]  # for ProgressDelegate
+        return None
+
+    def _state(self, task):
+        # Speed in whole tenths of KB/s: what is displayed, and a cheap cache key.
+        return (task.file_size, task.status, task.progress, int(round(task.speed * 10)), task.eta)
+
+    def _format(self, task, state):
+        file_size, status, progress, speed_tenths, eta = state
+        return (
+            task.file_name,
+            f"{file_size/1024:.2f} KB" if file_size else "N/A",
+            status,
+            fmt_pct(progress),
+            fmt_speed(speed_tenths),
+            eta,
+            task.date_added_str,
+            progress,
+        )
+
+    def _row_cells(self, row):
+        task = self._tasks[row]
+        entry = self._cells.get(task)
+        if entry is None:
+            state = self._state(task)
+            entry = self._cells[task] = (state, self._format(task, state))
+        return entry[1]
+
+    def task_at(self, row):
+        """Task shown in the given row, or None."""
+        return self._tasks[row] if 0 <= row < len(self._tasks) else None
+
+    def _sync_rows(self):
+        tasks = self.download_manager.get_all_tasks()
+        if tasks is self._source:
+            return
+        # The manager publishes a new tuple only when tasks are added or removed;
+        # apply just that difference so the view keeps its selection and scroll.
+        self._source = tasks
+        live = set(tasks)
+        for row in range(len(self._tasks) - 1, -1, -1):
+            if self._tasks[row] not in live:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self._cells.pop(self._tasks.pop(row), None)
+                self.endRemoveRows()
+        if len(tasks) > len(self._tasks):
+            # New tasks are always appended.
+            self.beginInsertRows(QModelIndex(), len(self._tasks), len(tasks) - 1)
+            self._tasks.extend(tasks[len(self._tasks):])
+            self.endInsertRows()
+        self._row_of = {task: row for row, task in enumerate(self._tasks)}
+
+    def on_task_changed(self, task):
+        """Slot for DownloadManager change notifications, delivered on the GUI thread."""
+        self._sync_rows()
+        row = self._row_of.get(task)
+        if row is None:
+            return  # removed
+        # Re-format and repaint the row only if its visible values moved.
+        state = self._state(task)
+        entry = self._cells.get(task)
+        if entry is None or entry[0] != state:
+            self._cells[task] = (state, self._format(task, state))
+            if entry is not None:
+                self.dataChanged.emit(self.index(row, 1), self.index(row, 5), [Qt.DisplayRole, Qt.UserRole])
+
+
+class TaskChangeRelay(QObject):
+    """Carries DownloadManager notifications from worker threads to the GUI thread."""
+    task_changed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = set()  # tasks with a queued signal not yet handled
+        self._lock = threading.Lock()
+
+    def notify(self, task):
+        # Called from any thread. At most one signal per task waits in the
+        # GUI event queue; the slot reads the task's latest state anyway, so
+        # further changes before it runs add nothing.
+        with self._lock:
+            if task in self._pending:
+                return
+            self._pending.add(task)
+        self.task_changed.emit(task)
+
+    def taken(self, task):
+        # Called by the slot before it reads the task, so a change made while
+        # it runs queues a fresh signal.
+        with self._lock:
+            self._pending.discard(task)
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """Paints the Progress column as a progress bar, with no widget per row."""
+    def paint(self, painter, option, index):
+        progress = index.data(Qt.UserRole) or 0
+        opt = QStyleOptionProgressBar()
+        opt.rect = option.rect
+        opt.minimum = 0
+        opt.maximum = 100
+        opt.progress = progress
+        opt.text = f"{progress}%"
+        opt.textVisible = True
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, opt, painter)
+
 
 class IDMMainWindow(QMainWindow):
     def __init__(self):
@@ -106,11 +272,11 @@ class IDMMainWindow(QMainWindow):
         self.settings = SettingsManager()
         self.logger = Logger()
         self.download_manager = DownloadManager(self.logger, self.settings)
-        self.details_windows = {}  # Dictionary to track open details windows.
+        self.details_windows = {}  # task.id -> open details window
         
         # Set up UI.
         self.init_ui()
-        self.setup_timers()
+        self.connect_download_manager()
 
     def init_ui(self):
         # Create central widget and layout.
@@ -122,12 +288,23 @@ class IDMMainWindow(QMainWindow):
         self.create_menu_bar()
         self.create_toolbar()
         
-        # Create table widget to display downloads.
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "File Name", "Size", "Status", "Progress", "Speed", "Time Left", "Date Added"
-        ])
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        # Model/view table of downloads.
+        self.model = DownloadTableModel(self.download_manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(3, ProgressDelegate(self.table))
+        # Fixed starting widths with user-resizable columns: no contents-based
+        # column measuring as rows update, and no re-sorting (the model is
+        # kept in the order downloads were added).
+        self.table.setSortingEnabled(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        for col, width in enumerate((240, 90, 90, 120, 90, 80)):
+            self.table.setColumnWidth(col, width)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.doubleClicked.connect(self.on_table_double_click)
         self.layout.addWidget(self.table)
 
     def create_menu_bar(self):
@@ -186,84 +363,71 @@ class IDMMainWindow(QMainWindow):
         delete_btn.triggered.connect(self.delete_selected)
         toolbar.addAction(delete_btn)
 
-    def setup_timers(self):
-        # Update table every second.
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.refresh_table)
-        self.update_timer.start(1000)
+    def connect_download_manager(self):
+        # The table is updated when the manager reports a change instead of
+        # being polled: no UI work at all while nothing is downloading. The
+        # queued connection runs the model slot on the GUI thread.
+        self._relay = TaskChangeRelay(self)
+        self._relay.task_changed.connect(self._on_task_changed, Qt.QueuedConnection)
+        self.download_manager.add_listener(self._relay.notify)
 
-    def refresh_table(self):
-        tasks = self.download_manager.get_all_tasks()
-        self.table.setRowCount(len(tasks))
-        for row, task in enumerate(tasks):
-            self.table.setItem(row, 0, QTableWidgetItem(task.file_name))
-            size_str = f"{task.file_size/1024:.2f} KB" if task.file_size else "N/A"
-            self.table.setItem(row, 1, QTableWidgetItem(size_str))
-            self.table.setItem(row, 2, QTableWidgetItem(task.status))
-            
-            # Progress column with progress bar.
-            progress_bar = QProgressBar()
-            progress_bar.setValue(task.progress)
-            self.table.setCellWidget(row, 3, progress_bar)
-            
-            speed_str = f"{task.speed:.1f} KB/s" if task.speed > 0 else "0 KB/s"
-            self.table.setItem(row, 4, QTableWidgetItem(speed_str))
-            self.table.setItem(row, 5, QTableWidgetItem(task.eta))
-            self.table.setItem(row, 6, QTableWidgetItem(task.date_added.strftime("%b %d, %Y %H:%M:%S")))
+    def _on_task_changed(self, task):
+        self._relay.taken(task)
+        self.model.on_task_changed(task)
 
     def add_url_dialog(self):
         dialog = AddUrlDialog(self.settings.default_download_dir)
         if dialog.exec_() == QDialog.Accepted:
-            info = dialog.get_info()
-            self.download_manager.add_download(
-                info['url'],
-                info['dest_folder'],
-                info['file_name'],
-                info['segments'],
-                info['schedule_time'],
-                resolution=info['resolution']
+            req = dialog.get_info()
+            task = self.download_manager.add_download(
+                req.url, req.dest_folder, req.file_name, req.segments, req.schedule_time,
+                resolution=req.resolution
             )
-            # Optionally, open details window immediately.
-            last_task = self.download_manager.last_task()
-            if last_task:
-                self.open_details_window(last_task)
+            # Optionally, open details window immediately (for an already
+            # running duplicate this brings up its existing window).
+            if task:
+                self.open_details_window(task)
 
     def open_details_window(self, task):
         # Bring existing details window to front if already open.
-        if task in self.details_windows:
-            self.details_windows[task].raise_()
-            self.details_windows[task].activateWindow()
+        win = self.details_windows.get(task.id)
+        if win is not None:
+            win.raise_()
+            win.activateWindow()
         else:
             details_win = DownloadDetailsWindow(task, self.download_manager, self.logger)
             details_win.show()
-            details_win.destroyed.connect(lambda: self.details_windows.pop(task, None))
-            self.details_windows[task] = details_win
+            # Delete on close so the entry below is dropped and a later open
+            # builds a fresh window instead of raising a hidden one.
+            details_win.setAttribute(Qt.WA_DeleteOnClose)
+            details_win.destroyed.connect(lambda _=None, tid=task.id: self.details_windows.pop(tid, None))
+            self.details_windows[task.id] = details_win
 
-    def on_table_double_click(self, row, col):
-        tasks = self.download_manager.get_all_tasks()
-        if 0 <= row < len(tasks):
-            self.open_details_window(tasks[row])
+    def on_table_double_click(self, index):
+        task = self.model.task_at(index.row())
+        if task:
+            self.open_details_window(task)
+
+    def selected_task(self):
+        return self.model.task_at(self.table.currentIndex().row())
 
     def resume_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            task = self.download_manager.get_all_tasks()[row]
+        task = self.selected_task()
+        if task:
             self.download_manager.resume_task(task)
             self.open_details_window(task)
 
     def stop_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            task = self.download_manager.get_all_tasks()[row]
+        task = self.selected_task()
+        if task:
             self.download_manager.stop_task(task)
 
     def stop_all(self):
         self.download_manager.stop_all()
 
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            task = self.download_manager.get_all_tasks()[row]
+        task = self.selected_task()
+        if task:
             reply = QMessageBox.question(self, "Confirm Delete",
                                          "Are you sure you want to delete this download?",
                                          QMessageBox.Yes | QMessageBox.No)
@@ -280,6 +444,11 @@ class IDMMainWindow(QMainWindow):
         QMessageBox.information(self, "About IDM Clone",
                                 "IDM Clone - Professional Edition\nDeveloped in Python using PyQt5.\nAll rights reserved.")
 
+    def closeEvent(self, event):
+        # Stop downloads so the worker pool can wind down before the process exits.
+        self.download_manager.shutdown()
+        event.accept()
+
 # Download Details Window – appears when a download starts/resumes or on double-click.
 class DownloadDetailsWindow(QDialog):
     def __init__(self, task, download_manager, logger):
@@ -319,62 +488,90 @@ class DownloadDetailsWindow(QDialog):
         s_layout.addWidget(self.eta_label)
         s_layout.addWidget(self.progress_bar)
         
-        # Speed Limiter Tab Layout
+        # Speed Limiter and Completion Options are built when first shown;
+        # most windows are opened just to watch progress.
+        self._tab_builders = {1: self._build_speed_tab, 2: self._build_options_tab}
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+        
+        # Bottom Buttons
+        btn_layout = QHBoxLayout()
+        self.pause_btn = QPushButton("Pause" if self.task.status == "Downloading" else "Resume")
+        self.pause_btn.clicked.connect(self.toggle_pause_resume)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.clicked.connect(self.stop_download)
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.close)
+        btn_layout.addWidget(self.pause_btn)
+        btn_layout.addWidget(self.stop_btn)
+        btn_layout.addWidget(self.close_btn)
+        main_layout.addLayout(btn_layout)
+
+    def _ensure_tab_built(self, index):
+        build = self._tab_builders.pop(index, None)
+        if build is not None:
+            build()
+
+    def _build_speed_tab(self):
         sp_layout = QVBoxLayout(self.speed_tab)
         self.limiter_label = QLabel("Set Speed Limit (KB/s), 0 for unlimited:")
         self.limiter_spin = QSpinBox()
         self.limiter_spin.setRange(0, 100000)
-        self.limiter_spin.setValue(0)
+        self.limiter_spin.setValue(self.task.bucket.rate // 1024 if hasattr(self.task, "bucket") else 0)
         sp_layout.addWidget(self.limiter_label)
         sp_layout.addWidget(self.limiter_spin)
         apply_btn = QPushButton("Apply")
         apply_btn.clicked.connect(self.apply_speed_limit)
         sp_layout.addWidget(apply_btn)
         sp_layout.addStretch()
-        
-        # Completion Options Tab Layout
+
+    def _build_options_tab(self):
         o_layout = QVBoxLayout(self.options_tab)
         self.shutdown_checkbox = QPushButton("Shutdown computer on completion (demo)")
         self.shutdown_checkbox.setCheckable(True)
         o_layout.addWidget(self.shutdown_checkbox)
         o_layout.addStretch()
-        
-        # Bottom Buttons
-        btn_layout = QHBoxLayout()
-        self.pause_btn = QPushButton("Pause" if self.task.status == "Downloading" else "Resume")
-        self.pause_btn.clicked.connect(self.toggle_pause_resume)
-        self.stop_btn = QPushButton("Stop")
-        self.stop_btn.clicked.connect(self.stop_download)
-        self.close_btn = QPushButton("Close")
-        self.close_btn.clicked.connect(self.close)
-        btn_layout.addWidget(self.pause_btn)
-        btn_layout.addWidget(self.stop_btn)
-        btn_layout.addWidget(self.close_btn)
-        main_layout.addLayout(btn_layout)
 
     def setup_timer(self):
+        self._last_state = None
         self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.CoarseTimer)
         self.timer.timeout.connect(self.update_ui)
-        self.timer.start(500)
+        self.timer.start(1000)
 
     def update_ui(self):
-        self.status_label.setText(f"Status: {self.task.status}")
-        if self.task.file_size:
-            self.size_label.setText(f"File Size: {self.task.file_size/1024:.2f} KB")
-            downloaded = (self.task.file_size * self.task.progress / 100)
-            self.downloaded_label.setText(f"Downloaded: {downloaded/1024:.2f} KB")
-        else:
-            self.size_label.setText("File Size: N/A")
-            self.downloaded_label.setText("Downloaded: N/A")
-        self.speed_label.setText(f"Speed: {self.task.speed:.1f} KB/s")
-        self.eta_label.setText(f"ETA: {self.task.eta}")
-        self.progress_bar.setValue(self.task.progress)
-        if self.task.status == "Downloading":
-            self.pause_btn.setText("Pause")
-        elif self.task.status == "Paused":
-            self.pause_btn.setText("Resume")
-        else:
-            self.pause_btn.setEnabled(False)
+        # Skip the label/progress rewrites when nothing changed since the last
+        # tick, and otherwise touch only the widgets whose inputs changed.
+        state = (self.task.status, self.task.file_size, self.task.progress,
+                 round(self.task.speed, 1), self.task.eta)
+        old = self._last_state or (None,) * len(state)
+        if state == old:
+            return
+        self._last_state = state
+        status, file_size, progress, speed, eta = state
+        if status != old[0]:
+            self.status_label.setText(f"Status: {status}")
+            # Queued/Scheduled disable the button; re-enable it once the task runs.
+            self.pause_btn.setEnabled(status in ("Downloading", "Paused"))
+            if status == "Downloading":
+                self.pause_btn.setText("Pause")
+            elif status == "Paused":
+                self.pause_btn.setText("Resume")
+            if status in ["Completed", "Error", "Cancelled"]:
+                self.timer.stop()
+        if (file_size, progress) != old[1:3]:
+            if file_size:
+                self.size_label.setText(f"File Size: {file_size/1024:.2f} KB")
+                downloaded = (file_size * progress / 100)
+                self.downloaded_label.setText(f"Downloaded: {downloaded/1024:.2f} KB")
+            else:
+                self.size_label.setText("File Size: N/A")
+                self.downloaded_label.setText("Downloaded: N/A")
+        if speed != old[3]:
+            self.speed_label.setText(f"Speed: {speed:.1f} KB/s")
+        if eta != old[4]:
+            self.eta_label.setText(f"ETA: {eta}")
+        if progress != old[2]:
+            self.progress_bar.setValue(progress)
 
     def toggle_pause_resume(self):
         if self.task.status == "Downloading":
@@ -388,7 +585,11 @@ class DownloadDetailsWindow(QDialog):
 
     def apply_speed_limit(self):
         limit = self.limiter_spin.value()
-        self.logger.log(f"Speed limit for {self.task.file_name} set to {limit} KB/s (not enforced in demo).")
+        if hasattr(self.task, "bucket"):
+            self.task.bucket.rate = limit * 1024
+            self.logger.log(f"Speed limit for {self.task.file_name} set to {limit} KB/s.")
+        else:
+            self.logger.log(f"Speed limit is not supported for video downloads ({self.task.file_name}).")
 
     def closeEvent(self, event):
         self.timer.stop()
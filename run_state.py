@@ -0,0 +1,29 @@
+"""
+run_state.py – Running/stopped state shared by the threads of one run of a download.
+Workers read the state without locking between chunks; the Condition only
+serves waits that a stop must cut short (e.g. the speed limiter's sleep).
+A pause stops the run, and a resume starts a new one with a new RunState.
+"""
+
+import threading
+
+RUNNING = "running"
+STOPPED = "stopped"
+
+class RunState:
+    def __init__(self):
+        self.state = RUNNING
+        self._cv = threading.Condition()
+
+    def stop(self):
+        with self._cv:
+            self.state = STOPPED
+            self._cv.notify_all()
+
+    def is_stopped(self):
+        return self.state == STOPPED
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds, ending early on stop (like Event.wait); True if stopped."""
+        with self._cv:
+            return self._cv.wait_for(lambda: self.state == STOPPED, timeout)
@@ -1,15 +1,28 @@
 """
 segment.py – Represents a single segment in a segmented download.
-Handles the actual HTTP range request, writing to a temporary file,
+Handles the actual HTTP range request, writing either straight into its
+byte range of the (preallocated) final file or to a temporary part file,
 and reporting downloaded bytes back to the DownloadTask.
 """
 
 import os
-import requests
 import time
 
+# Bytes requested per read from the response stream. A read blocks until it
+# is full, and stop checks and progress happen between reads, so this bounds
+# how long a pause waits and how coarse progress is on a slow link; at 128 KiB
+# the per-chunk Python overhead (loop iteration, write call) is still small.
+CHUNK_SIZE = 128 * 1024
+
 class Segment:
-    def __init__(self, url, dest_folder, file_name, start, end, logger, settings):
+    # Segments are created per range and per dynamic split; slots keep them
+    # small and make the attribute reads in download() cheaper.
+    __slots__ = ("url", "dest_folder", "file_name", "start", "end", "logger", "settings", "session",
+                 "in_place", "final_path", "bucket", "downloaded", "is_finished", "is_stopped",
+                 "range_ignored", "temp_path", "run_started", "run_base")
+
+    def __init__(self, url, dest_folder, file_name, start, end, logger, settings, session,
+                 in_place=False, bucket=None):
         self.url = url
         self.dest_folder = dest_folder
         self.file_name = file_name
@@ -17,45 +30,120 @@ class Segment:
         self.end = end  # Can be None for unknown length.
         self.logger = logger
         self.settings = settings
+        self.session = session  # DownloadManager's pooled requests.Session
+        # In-place segments write at their offset in the final file, which the
+        # task has already created at full size; otherwise bytes go to temp_path.
+        self.in_place = in_place
+        self.final_path = os.path.join(dest_folder, file_name)
+        self.bucket = bucket  # speed_limiter.TokenBucket shared by the task, if any
 
         self.downloaded = 0
         self.is_finished = False
-        self.is_stopped = False
+        self.is_stopped = False  # also set by the task to abort this segment
+        self.range_ignored = False  # server answered our Range with the whole body
+        # When the current download() began receiving, and self.downloaded then (see rate()).
+        self.run_started = None
+        self.run_base = 0
 
         seg_id = f"{start or 0}-{end or 'end'}"
         self.temp_path = os.path.join(dest_folder, f"{file_name}.part_{seg_id}")
 
-    def download(self, stop_event, pause_event):
+    def download(self, run_state, on_bytes=None):
+        """
+        run_state is the current run's run_state.RunState; on_bytes(n), if given, is
+        told every change to self.downloaded.
+        """
         if self.is_finished or self.is_stopped:
             return
 
-        headers = {}
-        if self.settings.user_agent:
-            headers["User-Agent"] = self.settings.user_agent
-        if self.start is not None and self.end is not None:
-            downloaded_so_far = 0
-            if os.path.exists(self.temp_path):
-                downloaded_so_far = os.path.getsize(self.temp_path)
-            actual_start = self.start + downloaded_so_far
+        before = self.downloaded
+
+        headers = {}  # User-Agent comes from the session defaults
+        ranged = self.start is not None and self.end is not None
+        if ranged:
+            if not self.in_place:
+                # One stat gives both existence and the bytes already on disk.
+                try:
+                    self.downloaded = os.stat(self.temp_path).st_size
+                except FileNotFoundError:
+                    self.downloaded = 0
+            actual_start = self.start + self.downloaded
             headers["Range"] = f"bytes={actual_start}-{self.end}"
+        else:
+            # Without a Range request the body always starts at byte 0.
+            self.downloaded = 0
+        if on_bytes is not None and self.downloaded != before:
+            on_bytes(self.downloaded - before)
 
         try:
-            with requests.get(self.url, headers=headers, stream=True, timeout=10) as r:
+            with self.session.get(self.url, headers=headers, stream=True, timeout=10) as r:
                 r.raise_for_status()
-                mode = "ab" if os.path.exists(self.temp_path) else "wb"
-                with open(self.temp_path, mode) as f:
-                    for chunk in r.iter_content(chunk_size=65536):  # 64 KB chunks
-                        if stop_event.is_set():
-                            self.is_stopped = True
+                if ranged and r.status_code != 206:
+                    # The server sent the whole body instead of our range; writing it
+                    # at our offset would corrupt the file.
+                    self.logger.log(f"Server ignored Range for segment {self.start}-{self.end} of {self.file_name}")
+                    self.range_ignored = True
+                    self.is_stopped = True
+                    return
+                if ranged:
+                    # "bytes first-last/total": a 206 for some other offset
+                    # would be written at the wrong place just the same.
+                    content_range = r.headers.get("Content-Range", "")
+                    first = content_range.partition(" ")[2].partition("-")[0]
+                    if first and first != str(actual_start):
+                        self.logger.log(f"Unexpected Content-Range '{content_range}' for segment "
+                                        f"{self.start}-{self.end} of {self.file_name}")
+                        self.is_stopped = True
+                        return
+                # Unbuffered (raw FileIO): chunks are already 128 KiB, so a Python-side
+                # buffer only adds a copy and a lock; the write syscall itself runs
+                # without the GIL, letting segment threads overlap their disk I/O.
+                if self.in_place:
+                    f = open(self.final_path, "r+b", buffering=0)
+                    f.seek(self.start + self.downloaded)
+                else:
+                    f = open(self.temp_path, "ab" if ranged and self.downloaded else "wb", buffering=0)
+                with f:
+                    # Bind per-chunk lookups to locals once; this loop runs for every chunk.
+                    stopped = run_state.is_stopped
+                    write = f.write
+                    self.run_base = self.downloaded
+                    self.run_started = time.monotonic()
+                    start = self.start
+                    consume = self.bucket.consume if self.bucket is not None else None
+                    # Read the urllib3 response directly: iter_content wraps each
+                    # chunk in its generator and exception-translation layers.
+                    # decode_content stays on only as a safety net; the session
+                    # asks for identity encoding, so nothing is decoded.
+                    read = r.raw.read
+                    while True:
+                        chunk = read(CHUNK_SIZE, decode_content=True)
+                        if not chunk:
                             break
-                        while not pause_event.is_set() and not stop_event.is_set():
-                            time.sleep(0.1)
-                        if stop_event.is_set():
+                        if consume is not None:
+                            # Wait out the speed limit before reading self.end: a
+                            # split during the sleep must see where we really are,
+                            # not cut into bytes we are about to write.
+                            consume(len(chunk), run_state)
+                        if stopped() or self.is_stopped:
                             self.is_stopped = True
                             break
-                        if chunk:
-                            f.write(chunk)
-                            self.downloaded += len(chunk)
+                        end = self.end
+                        if end is not None:
+                            # end may shrink while we run (dynamic segmentation),
+                            # so never write past the current end of our range.
+                            left = (end - start) + 1 - self.downloaded
+                            if left <= 0:
+                                break
+                            chunk = chunk[:left]
+                        view = memoryview(chunk)
+                        while view:
+                            view = view[write(view):]  # raw writes may be short
+                        self.downloaded += len(chunk)
+                        if on_bytes is not None:
+                            # One call per chunk (up to CHUNK_SIZE), so the
+                            # task lock is taken rarely.
+                            on_bytes(len(chunk))
             if not self.is_stopped:
                 if self.end is not None:
                     total_length = (self.end - self.start) + 1
@@ -64,9 +152,18 @@ class Segment:
                 else:
                     self.is_finished = True
         except Exception as e:
-            self.logger.log(f"Segment download error [{self.temp_path}]: {e}")
+            target = self.final_path if self.in_place else self.temp_path
+            self.logger.log(f"Segment download error [{target} @ {self.start}-{self.end}]: {e}")
             self.is_stopped = True
 
+    def rate(self):
+        """This segment's own throughput (bytes/s) since it began receiving; 0 if not yet known."""
+        started = self.run_started
+        if started is None:
+            return 0
+        elapsed = time.monotonic() - started
+        return (self.downloaded - self.run_base) / elapsed if elapsed > 0 else 0
+
     @property
     def remaining(self):
         if self.end is None or self.is_finished:
@@ -3,29 +3,78 @@ settings.py – Manages user preferences (download directory, user-agent, etc.)
 """
 
 import os
-import json
+
+# orjson is optional: a C parser/serializer, used when installed.
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    _loads = json.loads
+    def _dumps(data):
+        return json.dumps(data, indent=4).encode("utf-8")
+
+# Parsed settings files keyed by (path, mtime_ns, size): a SettingsManager
+# created while the file is unchanged reuses the dict instead of re-parsing.
+_SETTINGS_CACHE = {}
 
 class SettingsManager:
     def __init__(self):
         self.default_download_dir = os.path.expanduser("~/Downloads")
         self.user_agent = "IDMClone/1.0"
+        self.speed_limit = 0  # KB/s per download, 0 for unlimited
+        self.max_concurrent_downloads = 4
+        self.segments_per_task = 8  # worker threads budgeted per download (incl. dynamic splits)
+        self.proxy = ""  # "host:port" or a full proxy URL, "" for a direct connection
         self.settings_file = "idm_settings.json"
         self.load()
+        self._update_proxies()
 
     def load(self):
-        if os.path.exists(self.settings_file):
+        try:
+            st = os.stat(self.settings_file)
+        except OSError:
+            return  # no settings saved yet
+        key = (os.path.abspath(self.settings_file), st.st_mtime_ns, st.st_size)
+        data = _SETTINGS_CACHE.get(key)
+        if data is None:
             try:
-                with open(self.settings_file, "r") as f:
-                    data = json.load(f)
-                    self.default_download_dir = data.get("default_download_dir", self.default_download_dir)
-                    self.user_agent = data.get("user_agent", self.user_agent)
+                with open(self.settings_file, "rb") as f:
+                    data = _loads(f.read())
             except:
-                pass
+                return
+            if not isinstance(data, dict):
+                return  # valid JSON but not a settings object ([], null, ...)
+            _SETTINGS_CACHE.clear()  # only the current version is worth keeping
+            _SETTINGS_CACHE[key] = data
+        self.default_download_dir = data.get("default_download_dir", self.default_download_dir)
+        self.user_agent = data.get("user_agent", self.user_agent)
+        self.speed_limit = data.get("speed_limit", self.speed_limit)
+        self.max_concurrent_downloads = data.get("max_concurrent_downloads", self.max_concurrent_downloads)
+        self.segments_per_task = data.get("segments_per_task", self.segments_per_task)
+        self.proxy = data.get("proxy", self.proxy)
+
+    def _update_proxies(self):
+        # Parsed once here (and on save) into the mapping requests expects;
+        # DownloadManager installs it on its session instead of per request.
+        proxy = self.proxy.strip()
+        if proxy and "://" not in proxy:
+            proxy = "http://" + proxy  # the dialog asks for host:port
+        self.proxies = {"http": proxy, "https": proxy} if proxy else {}
 
     def save(self):
         data = {
             "default_download_dir": self.default_download_dir,
-            "user_agent": self.user_agent
+            "user_agent": self.user_agent,
+            "speed_limit": self.speed_limit,
+            "max_concurrent_downloads": self.max_concurrent_downloads,
+            "segments_per_task": self.segments_per_task,
+            "proxy": self.proxy
         }
-        with open(self.settings_file, "w") as f:
-            json.dump(data, f, indent=4)
+        self._update_proxies()
+        with open(self.settings_file, "wb") as f:
+            f.write(_dumps(data))
+        # The write changed mtime/size, so the old entry can never match again.
+        _SETTINGS_CACHE.clear()
@@ -0,0 +1,38 @@
+"""
+speed_limiter.py – Token-bucket rate limiter used to enforce per-download speed limits.
+All segments of a download consume from the same bucket, so the limit applies
+to the download as a whole rather than to each connection.
+"""
+
+import threading
+import time
+
+class TokenBucket:
+    def __init__(self, rate=0, burst=None):
+        self.rate = rate    # bytes per second; 0 means unlimited
+        self.burst = burst  # max tokens saved up while idle; defaults to one second's worth
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n, stop_event=None):
+        """
+        Take n bytes' worth of tokens, sleeping until the bucket can cover them.
+        A consumer may overdraw by one chunk and then waits off the debt, so
+        chunks larger than the burst size still work. The wait ends early if
+        stop_event (a threading.Event or run_state.RunState) is stopped.
+        """
+        rate = self.rate
+        if rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst or rate, self._tokens + (now - self._stamp) * rate)
+            self._stamp = now
+            self._tokens -= n
+            delay = -self._tokens / rate if self._tokens < 0 else 0
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
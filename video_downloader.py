@@ -5,12 +5,16 @@ and integrates with the IDM clone UI by updating progress, speed, ETA, and statu
 """
 
 import os
+import threading
 import time
 import datetime
+import uuid
 import yt_dlp
 
 class VideoDownloadTask:
-    def __init__(self, url, dest_folder, file_name, schedule_time, settings, logger, resolution="Best"):
+    def __init__(self, url, dest_folder, file_name, schedule_time, settings, logger, resolution="Best",
+                 on_change=None):
+        self.id = uuid.uuid4().hex  # stable key for UI bookkeeping
         self.url = url
         self.dest_folder = dest_folder
         # Use custom file name if provided; otherwise, let yt-dlp decide.
@@ -22,14 +26,31 @@ class VideoDownloadTask:
         
         # UI properties expected by the main window
         self.date_added = datetime.datetime.now()
+        self.date_added_str = self.date_added.strftime("%b %d, %Y %H:%M:%S")  # never changes; format once
         self.status = "Queued"
         self.progress = 0
         self.file_size = 0
         self.speed = 0
         self.eta = "N/A"
+        self._stop_requested = False
+        # fn(task) told about status/progress changes (DownloadManager.task_changed).
+        self._on_change = on_change
+        self._last_ui_update = 0.0  # monotonic time of the last 'downloading' update
+        self._future = None  # set by DownloadManager when start is submitted to its pool
+        # yt-dlp's extracted metadata (formats and their URLs), kept so a resume
+        # after pause skips the extractor's page fetches and parsing.
+        self._info = None
+        self._ydl = None  # this task's YoutubeDL, built on first start (see start)
+        # Held by a run until yt-dlp has returned, so a resume never drives
+        # _ydl and the .part file alongside a run that is still unwinding.
+        self._run_lock = threading.Lock()
+        self._stops = 0  # bumped by stop(); lets a start waiting for the lock see it
 
-    def start(self):
-        self.status = "Downloading"
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def _make_ydl(self):
         # Configure output template.
         if self.file_name:
             outtmpl = os.path.join(self.dest_folder, self.file_name + ".%(ext)s")
@@ -40,6 +61,9 @@ class VideoDownloadTask:
             'outtmpl': outtmpl,
             'progress_hooks': [self.progress_hook],
             'noplaylist': True,
+            # Fragmented (HLS/DASH) streams: use the same per-download thread
+            # budget as a segmented HTTP download.
+            'concurrent_fragment_downloads': max(1, self.settings.segments_per_task),
         }
         # If resolution is not "Best", set format filter.
         if self.resolution.lower() != "best":
@@ -51,43 +75,100 @@ class VideoDownloadTask:
         # Set custom user-agent if provided.
         if self.settings.user_agent:
             ydl_opts['http_headers'] = {'User-Agent': self.settings.user_agent}
-            
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                ydl.download([self.url])
-            except Exception as e:
-                self.logger.log(f"Error downloading video from {self.url}: {e}")
-                self.status = "Error"
+        if self.settings.proxies:
+            ydl_opts['proxy'] = self.settings.proxies['https']
+        return yt_dlp.YoutubeDL(ydl_opts)
+
+    def _close_ydl(self):
+        if self._ydl is not None:
+            self._ydl.close()
+            self._ydl = None
+
+    def start(self):
+        stops = self._stops
+        with self._run_lock:
+            if self._stops != stops:
+                return  # stopped again while the previous run was unwinding
+            self._run()
+
+    def _run(self):
+        # Cleared only now: the previous run exits at its next progress
+        # callback only while _stop_requested is still set.
+        self._stop_requested = False
+        self.status = "Downloading"
+        self._changed()
+        # One YoutubeDL per task, kept across pause/resume: its options never
+        # change for a task, and a resume then reuses its extractor instances
+        # and open connections instead of building them all again.
+        if self._ydl is None:
+            self._ydl = self._make_ydl()
+        try:
+            if self._info is None:
+                self._info = self._ydl.extract_info(self.url, download=False)
+            self._ydl.process_ie_result(self._info, download=True)
+        except Exception as e:
+            if self._stop_requested:
+                if self.status != "Paused":
+                    self._close_ydl()
+                return  # aborted by stop(); status already set there
+            # Format URLs expire; a retry after an error starts afresh.
+            self._info = None
+            self._close_ydl()
+            self.logger.log(f"Error downloading video from {self.url}: {e}")
+            self.status = "Error"
+            self._changed()
+            return
+        self._close_ydl()  # finished
 
     def start_download(self):
         # Alias so that DownloadManager can call start_download() on any task.
         self.start()
 
+    def stop(self, pause_only=False):
+        # yt-dlp has no pause: abort at the next progress callback. Restarting
+        # later continues from the .part file yt-dlp leaves behind.
+        self._stops += 1
+        self._stop_requested = True
+        if self._future is not None:
+            self._future.cancel()  # still waiting for a worker: never starts
+        self.status = "Paused" if pause_only else "Cancelled"
+        self.logger.log(f"Stopped video download: {self.file_name or self.url}")
+        self._changed()
+
     def progress_hook(self, d):
+        if self._stop_requested:
+            raise yt_dlp.utils.DownloadCancelled()
         if d['status'] == 'downloading':
+            # yt-dlp calls this many times a second; the UI needs at most 4 of
+            # those, so skip the field updates and ETA formatting in between.
+            now = time.monotonic()
+            if now - self._last_ui_update < 0.25:
+                return
+            self._last_ui_update = now
             self.status = "Downloading"
-            if d.get('total_bytes'):
-                total = d.get('total_bytes')
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            if total:
                 downloaded = d.get('downloaded_bytes', 0)
-                self.progress = int(downloaded / total * 100)
-                self.file_size = total
-            elif d.get('total_bytes_estimate'):
-                total = d.get('total_bytes_estimate')
-                downloaded = d.get('downloaded_bytes', 0)
-                self.progress = int(downloaded / total * 100)
+                self.progress = int(downloaded * 100 // total)
                 self.file_size = total
             else:
                 self.progress = 0
-            if d.get('speed'):
-                self.speed = d.get('speed') / 1024.0
-            else:
-                self.speed = 0
-            if d.get('eta'):
-                self.eta = time.strftime("%H:%M:%S", time.gmtime(d.get('eta')))
+            # Numeric speed, not yt-dlp's private '_speed_str': the tables format
+            # and compare it like a segmented task's (KB/s as a float).
+            speed = d.get('speed')
+            self.speed = speed / 1024.0 if speed else 0
+            eta = d.get('eta')
+            if eta:
+                # divmod instead of gmtime+strftime; hours do not wrap after a day.
+                minutes, secs = divmod(int(eta), 60)
+                hours, minutes = divmod(minutes, 60)
+                self.eta = f"{hours:02d}:{minutes:02d}:{secs:02d}"
             else:
                 self.eta = "N/A"
+            self._changed()
         elif d['status'] == 'finished':
             self.progress = 100
             self.status = "Completed"
             self.eta = "00:00:00"
             self.logger.log(f"Video download completed: {self.file_name or self.url}")
+            self._changed()